@@ -7,12 +7,13 @@ and perform basic analysis.
 """
 
 import os
+import re
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # Set up project paths
 script_dir = Path(os.path.dirname(os.path.abspath(__file__)))
@@ -29,17 +30,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger('example_moex_api_usage')
 
-def get_bond_indices_info():
+# Maximum number of indices fetched concurrently
+FETCH_WORKERS = 8
+
+# Ticker prefixes of MOEX bond indices
+BOND_INDEX_RE = re.compile(
+    '|'.join(['RGBI', 'RUCBI', 'RUEU', 'RUCNY', 'RUGROW', 'DOMMBS', 'RUABI', 'RUPCI', 'RUPMI', 'RUPAI']),
+    re.IGNORECASE
+)
+
+def get_bond_indices_info(moex):
     """Get information about available bond indices."""
-    # Initialize MOEX data source
-    moex = MOEXDataSource()
-    
     # Get all available indices
     indices = moex.get_securities('stock', 'index')
     
     # Filter for bond indices
-    bond_pattern = '|'.join(['RGBI', 'RUCBI', 'RUEU', 'RUCNY', 'RUGROW', 'DOMMBS', 'RUABI', 'RUPCI', 'RUPMI', 'RUPAI'])
-    bond_indices = indices[indices['SECID'].str.contains(bond_pattern, na=False, regex=True, case=False)]
+    bond_indices = indices[indices['SECID'].str.contains(BOND_INDEX_RE, na=False)]
     
     print(f"\nFound {len(bond_indices)} bond indices")
     print("\nSample of available bond indices:")
@@ -47,65 +53,86 @@ def get_bond_indices_info():
     
     return bond_indices
 
-def fetch_and_compare_indices(indices_to_compare):
+def fetch_and_compare_indices(moex, indices_to_compare):
     """Fetch and compare multiple bond indices."""
-    # Initialize MOEX data source
-    moex = MOEXDataSource()
-    
     # Set date range for the last 3 years
     end_date = datetime.now()
     start_date = end_date - timedelta(days=365 * 3)
     
-    # Fetch data for each index
-    all_data = {}
+    # Get securities once to find the board of each index; an index listed on
+    # several boards uses the first one, as a per-index lookup would
+    securities = moex.get_securities('stock', 'index').drop_duplicates('SECID')
+    boards = dict(zip(securities['SECID'], securities['BOARDID']))
     
-    for index_code in indices_to_compare:
+    def fetch_one(index_code):
         logger.info(f"Fetching data for {index_code}")
-        
-        # Get securities to find the board
-        securities = moex.get_securities('stock', 'index')
-        search_results = securities[securities['SECID'] == index_code]
-        
-        if search_results.empty:
-            logger.warning(f"Index {index_code} not found")
-            continue
-            
-        board = search_results.iloc[0]['BOARDID']
-        
-        # Fetch historical data
-        df = moex.get_historical_data(
+        return moex.get_historical_data(
             engine='stock',
             market='index',
-            board=board,
+            board=boards[index_code],
             security=index_code,
             from_date=start_date,
             till_date=end_date
         )
-        
-        if df.empty:
-            logger.warning(f"No data found for {index_code}")
+    
+    found_indices = []
+    for index_code in indices_to_compare:
+        if index_code not in boards:
+            logger.warning(f"Index {index_code} not found")
             continue
-            
-        # Convert TRADEDATE to datetime
-        df['TRADEDATE'] = pd.to_datetime(df['TRADEDATE'])
-        
-        # Store in dictionary
-        all_data[index_code] = df
+        found_indices.append(index_code)
+    
+    # Fetch historical data for all indices concurrently, handling each
+    # index as soon as its download finishes
+    fetched = {}
+    
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, max(1, len(found_indices)))) as executor:
+        futures = {executor.submit(fetch_one, index_code): index_code for index_code in found_indices}
         
-        logger.info(f"Fetched {len(df)} records for {index_code}")
+        for future in as_completed(futures):
+            index_code = futures[future]
+            try:
+                df = future.result()
+            except Exception as e:
+                logger.error(f"Error fetching data for {index_code}: {e}")
+                continue
+            
+            if df.empty:
+                logger.warning(f"No data found for {index_code}")
+                continue
+            
+            # Tag rows with their index so all series fit in one frame
+            fetched[index_code] = df.assign(INDEX_CODE=index_code)
+            
+            logger.info(f"Fetched {len(df)} records for {index_code}")
     
-    return all_data
+    # Keep the requested order of indices in the combined frame
+    frames = [fetched[index_code] for index_code in found_indices if index_code in fetched]
+    
+    if not frames:
+        return pd.DataFrame()
+    
+    return pd.concat(frames, ignore_index=True)
 
 def plot_indices_comparison(indices_data):
-    """Plot a comparison of multiple bond indices."""
+    """
+    Plot a comparison of multiple bond indices.
+    
+    Args:
+        indices_data: Long-form DataFrame from fetch_and_compare_indices,
+            with one row per index and trading date
+    """
+    # Import pyplot lazily so fetching data does not pay for backend setup
+    import matplotlib.pyplot as plt
+    
+    # Normalize every index to 100 at its start in one vectorized pass
+    first_close = indices_data.groupby('INDEX_CODE', sort=False)['CLOSE'].transform('first')
+    indices_data = indices_data.assign(NORMALIZED=indices_data['CLOSE'] / first_close * 100)
+    
     plt.figure(figsize=(12, 8))
     
-    for index_code, df in indices_data.items():
-        # Normalize to 100 at the start
-        first_value = df.iloc[0]['CLOSE']
-        normalized_values = df['CLOSE'] / first_value * 100
-        
-        plt.plot(df['TRADEDATE'], normalized_values, label=f"{index_code}")
+    for index_code, df in indices_data.groupby('INDEX_CODE', sort=False):
+        plt.plot(df['TRADEDATE'].to_numpy(), df['NORMALIZED'].to_numpy(), label=f"{index_code}")
     
     plt.title('Bond Indices Comparison (Normalized to 100)')
     plt.xlabel('Date')
@@ -126,8 +153,12 @@ def plot_indices_comparison(indices_data):
 
 def main():
     """Main function to demonstrate MOEX ISS API usage."""
+    # Initialize one MOEX data source, so the securities list it caches is
+    # fetched once for both steps below
+    moex = MOEXDataSource()
+    
     # Get information about available bond indices
-    bond_indices = get_bond_indices_info()
+    bond_indices = get_bond_indices_info(moex)
     
     # Select a few indices to compare
     indices_to_compare = [
@@ -139,10 +170,10 @@ def main():
     ]
     
     # Fetch data for selected indices
-    indices_data = fetch_and_compare_indices(indices_to_compare)
+    indices_data = fetch_and_compare_indices(moex, indices_to_compare)
     
     # Plot comparison
-    if indices_data:
+    if not indices_data.empty:
         plot_indices_comparison(indices_data)
     else:
         logger.warning("No data to plot")
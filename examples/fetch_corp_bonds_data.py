@@ -14,13 +14,18 @@ import os
 import sys
 import logging
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import matplotlib.pyplot as plt
 from pathlib import Path
 
 # Add the src directory to the path so we can import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.moex_bond_data import MOEXBondData
+from src.storage import save_csv
+
+# Charts are only saved to files, so use the non-interactive Agg backend
+# unless the user has chosen a backend explicitly
+os.environ.setdefault('MPLBACKEND', 'Agg')
 
 # Configure logging
 logging.basicConfig(
@@ -33,32 +38,37 @@ logger = logging.getLogger(__name__)
 DATA_DIR = Path('./data')
 DATA_DIR.mkdir(exist_ok=True)
 
-def fetch_and_save_bond_data(sample_size=5):
+# Date range of the analysis
+FROM_DATE = "2022-09-19"
+TILL_DATE = "2025-04-04"
+
+# Maximum number of concurrent requests to the MOEX ISS API
+FETCH_WORKERS = 8
+
+# Resolution of the saved PNG charts
+CHART_DPI = 90
+
+# Tick label format for chart date axes
+CHART_DATE_FORMAT = '%Y-%m-%d'
+
+def fetch_and_save_bond_data(bond_client, russian_bonds, sample_size=5):
     """
     Fetch and save detailed bond data for Russian domestic bonds
     within the specified date range.
-    """
-    # Initialize the MOEX Bond Data client
-    bond_client = MOEXBondData()
     
-    # Define the date range
-    from_date = "2022-09-19"
-    till_date = "2025-04-04"
-    
-    logger.info(f"Fetching Russian domestic bonds data for period: {from_date} to {till_date}")
-    
-    # Find Russian domestic bonds active in the specified period
-    russian_bonds = bond_client.find_russian_domestic_bonds(from_date, till_date)
-    
-    if russian_bonds.empty:
-        logger.warning("No Russian domestic bonds found in the specified period")
-        return
-    
-    logger.info(f"Found {len(russian_bonds)} Russian domestic bonds")
+    Args:
+        bond_client: MOEXBondData instance
+        russian_bonds: DataFrame of bonds from find_russian_domestic_bonds
+        sample_size: Number of bonds to fetch detailed data for
+    """
+    from_date = FROM_DATE
+    till_date = TILL_DATE
+    from_ts = pd.Timestamp(from_date)
+    till_ts = pd.Timestamp(till_date)
     
     # Save the list of bonds to CSV
     bonds_file = DATA_DIR / "russian_domestic_bonds.csv"
-    russian_bonds.to_csv(bonds_file, index=False)
+    save_csv(russian_bonds, bonds_file, parquet_mirror=True)
     logger.info(f"Saved list of bonds to {bonds_file}")
     
     # For demonstration, select a few bonds to analyze in detail
@@ -78,156 +88,175 @@ def fetch_and_save_bond_data(sample_size=5):
             logger.error("Could not find ISIN column, cannot proceed")
             return
     
-    # Process each bond in the sample
-    for idx, bond in sample_bonds.iterrows():
-        try:
-            isin = bond.get('ISIN')
-            secid = bond.get('SECID')
-            name = bond.get('SHORTNAME', 'Unknown')
+    # Drop bonds without identifiers in one vectorized pass
+    valid_bonds = sample_bonds.dropna(subset=['ISIN', 'SECID'])
+    valid_bonds = valid_bonds[(valid_bonds['ISIN'] != '') & (valid_bonds['SECID'] != '')]
+    
+    skipped = len(sample_bonds) - len(valid_bonds)
+    if skipped:
+        logger.warning(f"Skipping {skipped} bonds without ISIN or SECID")
+    
+    # Import pyplot only once there is something to chart
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+    
+    # Resolve all sample ISINs from the bond list already fetched, instead of
+    # one lookup per getter call
+    bond_client.prefetch_security_info(valid_bonds['ISIN'].tolist(), russian_bonds)
+    
+    # A single figure is reused for every chart and cleared between them
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    # Process each bond in the sample. All network requests are queued on a
+    # thread pool up front so the MOEX round-trips overlap; the results are then
+    # saved and charted sequentially in this thread, since pandas writes and
+    # matplotlib are not thread-safe.
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        pending = []
+        for bond in valid_bonds.itertuples(index=False, name='Bond'):
+            isin = bond.ISIN
+            secid = bond.SECID
+            name = getattr(bond, 'SHORTNAME', 'Unknown')
             
-            if not isin or pd.isna(isin):
-                logger.warning(f"Bond at index {idx} has no ISIN, skipping")
-                continue
-                
-            if not secid or pd.isna(secid):
-                logger.warning(f"Bond at index {idx} has no SECID, skipping")
-                continue
+            futures = {
+                'parameters': executor.submit(bond_client.get_bond_parameters, isin),
+                'trading': executor.submit(bond_client.get_bond_daily_trading, isin, from_date, till_date),
+                'coupons': executor.submit(bond_client.get_bond_coupons, isin),
+                'amortizations': executor.submit(bond_client.get_bond_amortizations, isin),
+            }
+            pending.append((isin, secid, name, futures))
         
-            logger.info(f"Processing bond: {name} (ISIN: {isin})")
-            
-            # 1. Fetch instrument parameters
+        for isin, secid, name, futures in pending:
             try:
-                parameters = bond_client.get_bond_parameters(isin)
-                if not parameters.empty:
-                    params_file = DATA_DIR / f"{secid}_parameters.csv"
-                    parameters.to_csv(params_file, index=False)
-                    logger.info(f"Saved parameters to {params_file}")
-                else:
-                    logger.warning(f"No parameters found for bond {isin}")
-            except Exception as e:
-                logger.error(f"Error fetching parameters for bond {isin}: {e}")
+                logger.info(f"Processing bond: {name} (ISIN: {isin})")
+            
+                # 1. Fetch instrument parameters
+                try:
+                    parameters = futures['parameters'].result()
+                    if parameters:
+                        for block_name, block_df in parameters.items():
+                            params_file = DATA_DIR / f"{secid}_parameters_{block_name}.csv"
+                            save_csv(block_df, params_file)
+                            logger.info(f"Saved parameters to {params_file}")
+                    else:
+                        logger.warning(f"No parameters found for bond {isin}")
+                except Exception as e:
+                    logger.error(f"Error fetching parameters for bond {isin}: {e}")
         
-            # 2. Fetch daily trading results
-            try:
-                trading_data = bond_client.get_bond_daily_trading(isin, from_date, till_date)
-                if not trading_data.empty:
-                    trading_file = DATA_DIR / f"{secid}_trading.csv"
-                    trading_data.to_csv(trading_file, index=False)
-                    logger.info(f"Saved trading data to {trading_file}")
+                # 2. Fetch daily trading results
+                try:
+                    trading_data = futures['trading'].result()
+                    if not trading_data.empty:
+                        trading_file = DATA_DIR / f"{secid}_trading.csv"
+                        save_csv(trading_data, trading_file, parquet_mirror=True)
+                        logger.info(f"Saved trading data to {trading_file}")
                     
-                    # Create a simple price chart
-                    if 'CLOSE' in trading_data.columns and 'TRADEDATE' in trading_data.columns:
-                        try:
-                            plt.figure(figsize=(12, 6))
-                            plt.plot(pd.to_datetime(trading_data['TRADEDATE']), trading_data['CLOSE'])
-                            plt.title(f"{name} - Closing Price")
-                            plt.xlabel("Date")
-                            plt.ylabel("Price")
-                            plt.grid(True)
-                            chart_file = DATA_DIR / f"{secid}_price_chart.png"
-                            plt.savefig(chart_file)
-                            plt.close()
-                            logger.info(f"Saved price chart to {chart_file}")
-                        except Exception as e:
-                            logger.error(f"Error creating price chart for bond {isin}: {e}")
-                else:
-                    logger.warning(f"No trading data found for bond {isin}")
-            except Exception as e:
-                logger.error(f"Error fetching trading data for bond {isin}: {e}")
+                        # Create a simple price chart
+                        if 'CLOSE' in trading_data.columns and 'TRADEDATE' in trading_data.columns:
+                            try:
+                                ax.cla()
+                                ax.plot(mdates.date2num(trading_data['TRADEDATE'].to_numpy()), trading_data['CLOSE'].to_numpy())
+                                ax.xaxis_date()
+                                ax.xaxis.set_major_formatter(mdates.DateFormatter(CHART_DATE_FORMAT))
+                                ax.set_title(f"{name} - Closing Price")
+                                ax.set_xlabel("Date")
+                                ax.set_ylabel("Price")
+                                ax.grid(True)
+                                chart_file = DATA_DIR / f"{secid}_price_chart.png"
+                                fig.savefig(chart_file, dpi=CHART_DPI)
+                                logger.info(f"Saved price chart to {chart_file}")
+                            except Exception as e:
+                                logger.error(f"Error creating price chart for bond {isin}: {e}")
+                    else:
+                        logger.warning(f"No trading data found for bond {isin}")
+                except Exception as e:
+                    logger.error(f"Error fetching trading data for bond {isin}: {e}")
         
-            # 3. Fetch coupon payment schedule
-            try:
-                coupons = bond_client.get_bond_coupons(isin)
-                if not coupons.empty:
-                    # Filter coupons within our date range
-                    if 'coupondate' in coupons.columns:
-                        try:
-                            coupons['coupondate'] = pd.to_datetime(coupons['coupondate'])
-                            filtered_coupons = coupons[
-                                (coupons['coupondate'] >= pd.to_datetime(from_date)) & 
-                                (coupons['coupondate'] <= pd.to_datetime(till_date))
-                            ]
+                # 3. Fetch coupon payment schedule
+                try:
+                    coupons = futures['coupons'].result()
+                    if not coupons.empty:
+                        # Filter coupons within our date range
+                        if 'coupondate' in coupons.columns:
+                            try:
+                                filtered_coupons = coupons.loc[coupons['coupondate'].between(from_ts, till_ts)]
                             
-                            if not filtered_coupons.empty:
-                                coupons_file = DATA_DIR / f"{secid}_coupons.csv"
-                                filtered_coupons.to_csv(coupons_file, index=False)
-                                logger.info(f"Saved coupon schedule to {coupons_file}")
+                                if not filtered_coupons.empty:
+                                    coupons_file = DATA_DIR / f"{secid}_coupons.csv"
+                                    save_csv(filtered_coupons, coupons_file)
+                                    logger.info(f"Saved coupon schedule to {coupons_file}")
                                 
-                                # Create a coupon payment chart
-                                try:
-                                    plt.figure(figsize=(12, 6))
-                                    plt.bar(filtered_coupons['coupondate'], filtered_coupons['value'])
-                                    plt.title(f"{name} - Coupon Payments")
-                                    plt.xlabel("Date")
-                                    plt.ylabel("Coupon Value")
-                                    plt.grid(True)
-                                    chart_file = DATA_DIR / f"{secid}_coupon_chart.png"
-                                    plt.savefig(chart_file)
-                                    plt.close()
-                                    logger.info(f"Saved coupon chart to {chart_file}")
-                                except Exception as e:
-                                    logger.error(f"Error creating coupon chart for bond {isin}: {e}")
-                            else:
-                                logger.warning(f"No coupons found in the specified date range for bond {isin}")
-                        except Exception as e:
-                            logger.error(f"Error processing coupon dates for bond {isin}: {e}")
+                                    # Create a coupon payment chart
+                                    try:
+                                        ax.cla()
+                                        ax.bar(
+                                            mdates.date2num(filtered_coupons['coupondate'].to_numpy()),
+                                            filtered_coupons['value'].to_numpy(),
+                                            width=5.0
+                                        )
+                                        ax.xaxis_date()
+                                        ax.xaxis.set_major_formatter(mdates.DateFormatter(CHART_DATE_FORMAT))
+                                        ax.set_title(f"{name} - Coupon Payments")
+                                        ax.set_xlabel("Date")
+                                        ax.set_ylabel("Coupon Value")
+                                        ax.grid(True)
+                                        chart_file = DATA_DIR / f"{secid}_coupon_chart.png"
+                                        fig.savefig(chart_file, dpi=CHART_DPI)
+                                        logger.info(f"Saved coupon chart to {chart_file}")
+                                    except Exception as e:
+                                        logger.error(f"Error creating coupon chart for bond {isin}: {e}")
+                                else:
+                                    logger.warning(f"No coupons found in the specified date range for bond {isin}")
+                            except Exception as e:
+                                logger.error(f"Error processing coupon dates for bond {isin}: {e}")
+                        else:
+                            logger.warning(f"No 'coupondate' column found in coupon data for bond {isin}")
                     else:
-                        logger.warning(f"No 'coupondate' column found in coupon data for bond {isin}")
-                else:
-                    logger.warning(f"No coupon data found for bond {isin}")
-            except Exception as e:
-                logger.error(f"Error fetching coupon data for bond {isin}: {e}")
+                        logger.warning(f"No coupon data found for bond {isin}")
+                except Exception as e:
+                    logger.error(f"Error fetching coupon data for bond {isin}: {e}")
         
-            # 4. Fetch amortization schedule
-            try:
-                amortizations = bond_client.get_bond_amortizations(isin)
-                if not amortizations.empty:
-                    # Filter amortizations within our date range
-                    if 'amortdate' in amortizations.columns:
-                        try:
-                            amortizations['amortdate'] = pd.to_datetime(amortizations['amortdate'])
-                            filtered_amortizations = amortizations[
-                                (amortizations['amortdate'] >= pd.to_datetime(from_date)) & 
-                                (amortizations['amortdate'] <= pd.to_datetime(till_date))
-                            ]
+                # 4. Fetch amortization schedule
+                try:
+                    amortizations = futures['amortizations'].result()
+                    if not amortizations.empty:
+                        # Filter amortizations within our date range
+                        if 'amortdate' in amortizations.columns:
+                            try:
+                                filtered_amortizations = amortizations.loc[amortizations['amortdate'].between(from_ts, till_ts)]
                             
-                            if not filtered_amortizations.empty:
-                                amort_file = DATA_DIR / f"{secid}_amortizations.csv"
-                                filtered_amortizations.to_csv(amort_file, index=False)
-                                logger.info(f"Saved amortization schedule to {amort_file}")
-                            else:
-                                logger.warning(f"No amortizations found in the specified date range for bond {isin}")
-                        except Exception as e:
-                            logger.error(f"Error processing amortization dates for bond {isin}: {e}")
+                                if not filtered_amortizations.empty:
+                                    amort_file = DATA_DIR / f"{secid}_amortizations.csv"
+                                    save_csv(filtered_amortizations, amort_file)
+                                    logger.info(f"Saved amortization schedule to {amort_file}")
+                                else:
+                                    logger.warning(f"No amortizations found in the specified date range for bond {isin}")
+                            except Exception as e:
+                                logger.error(f"Error processing amortization dates for bond {isin}: {e}")
+                        else:
+                            logger.warning(f"No 'amortdate' column found in amortization data for bond {isin}")
                     else:
-                        logger.warning(f"No 'amortdate' column found in amortization data for bond {isin}")
-                else:
-                    logger.warning(f"No amortization data found for bond {isin}")
-            except Exception as e:
-                logger.error(f"Error fetching amortization data for bond {isin}: {e}")
+                        logger.warning(f"No amortization data found for bond {isin}")
+                except Exception as e:
+                    logger.error(f"Error fetching amortization data for bond {isin}: {e}")
             
-            logger.info(f"Completed processing for bond: {name}")
-            logger.info("-" * 50)
-        except Exception as e:
-            logger.error(f"Error processing bond at index {idx}: {e}")
+                logger.info(f"Completed processing for bond: {name}")
+                logger.info("-" * 50)
+            except Exception as e:
+                logger.error(f"Error processing bond {isin}: {e}")
+    
+    plt.close(fig)
 
-def analyze_bond_market():
+def analyze_bond_market(russian_bonds):
     """
     Perform basic analysis on the bond market data.
-    """
-    # Initialize the MOEX Bond Data client
-    bond_client = MOEXBondData()
-    
-    # Define the date range
-    from_date = "2022-09-19"
-    till_date = "2025-04-04"
     
-    # Find Russian domestic bonds active in the specified period
-    russian_bonds = bond_client.find_russian_domestic_bonds(from_date, till_date)
-    
-    if russian_bonds.empty:
-        logger.warning("No Russian domestic bonds found for analysis")
-        return
+    Args:
+        russian_bonds: DataFrame of bonds from find_russian_domestic_bonds
+    """
+    # Issuer types repeat across thousands of bonds, so count them as a categorical
+    if 'TYPENAME' in russian_bonds.columns:
+        russian_bonds = russian_bonds.assign(TYPENAME=russian_bonds['TYPENAME'].astype('category'))
     
     # Basic statistics
     logger.info(f"Total number of Russian domestic bonds: {len(russian_bonds)}")
@@ -243,22 +272,24 @@ def analyze_bond_market():
     if 'MATDATE' in russian_bonds.columns:
         # Handle invalid date values
         try:
-            # Replace invalid dates with NaT (Not a Time)
-            russian_bonds['MATDATE_CLEAN'] = russian_bonds['MATDATE'].replace('0000-00-00', pd.NaT)
-            
-            # Convert to datetime, handling errors
-            russian_bonds['MATURITY_YEAR'] = pd.to_datetime(russian_bonds['MATDATE_CLEAN'], errors='coerce').dt.year
+            # Convert to datetime; placeholders such as '0000-00-00' become NaT.
+            # Kept as a local Series so the caller's DataFrame is not modified.
+            maturity_years = pd.to_datetime(
+                russian_bonds['MATDATE'], format='%Y-%m-%d', errors='coerce', cache=True
+            ).dt.year
             
             # Drop NaN values for the chart
-            valid_maturities = russian_bonds.dropna(subset=['MATURITY_YEAR'])
+            valid_maturities = maturity_years.dropna()
             
             if not valid_maturities.empty:
-                maturity_counts = valid_maturities['MATURITY_YEAR'].value_counts().sort_index()
+                maturity_counts = valid_maturities.value_counts().sort_index()
                 logger.info("Bonds by maturity year:")
                 for year, count in maturity_counts.items():
                     logger.info(f"  {year}: {count}")
                 
                 # Create a chart of bonds by maturity year
+                import matplotlib.pyplot as plt
+                
                 plt.figure(figsize=(12, 6))
                 maturity_counts.plot(kind='bar')
                 plt.title("Russian Domestic Bonds by Maturity Year")
@@ -282,12 +313,27 @@ def main():
     logger.info("Starting MOEX bond data fetcher example")
     
     try:
+        # Initialize the MOEX Bond Data client
+        bond_client = MOEXBondData()
+        
+        logger.info(f"Fetching Russian domestic bonds data for period: {FROM_DATE} to {TILL_DATE}")
+        
+        # Find Russian domestic bonds active in the specified period once and
+        # share the result between the detailed fetch and the market analysis
+        russian_bonds = bond_client.find_russian_domestic_bonds(FROM_DATE, TILL_DATE)
+        
+        if russian_bonds.empty:
+            logger.warning("No Russian domestic bonds found in the specified period")
+            return
+        
+        logger.info(f"Found {len(russian_bonds)} Russian domestic bonds")
+        
         # Fetch and save detailed bond data
         # Use a small sample size (3) for testing to speed up execution
-        fetch_and_save_bond_data(sample_size=3)
+        fetch_and_save_bond_data(bond_client, russian_bonds, sample_size=3)
         
         # Perform basic market analysis
-        analyze_bond_market()
+        analyze_bond_market(russian_bonds)
         
         logger.info("MOEX bond data fetcher example completed")
     except Exception as e:
@@ -25,6 +25,7 @@ sys.path.append(str(project_dir))
 
 # Import the MOEX data source
 from src.moex_api_client import MOEXDataSource
+from src.storage import save_csv
 
 # Configure logging
 logging.basicConfig(
@@ -84,7 +85,7 @@ def fetch_and_save_bond_index(
         # Save to CSV
         filename = f"{ticker}_{date_str}.csv"
         file_path = data_dir / filename
-        df.to_csv(file_path, index=False)
+        save_csv(df, file_path, parquet_mirror=True)
             
         logger.info(f"Saved {len(df)} records to {file_path}")
         return {
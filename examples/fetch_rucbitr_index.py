@@ -16,6 +16,7 @@ import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 # Set up project paths
@@ -25,6 +26,7 @@ sys.path.append(str(project_dir))
 
 # Import the MOEX data source
 from src.moex_api_client import MOEXDataSource
+from src.storage import save_csv
 
 # Configure logging
 logging.basicConfig(
@@ -75,7 +77,13 @@ def fetch_corporate_bond_index(from_date, to_date=None):
     
     # Calculate daily returns
     if 'CLOSE' in df.columns and len(df) > 1:
-        df['DAILY_RETURN'] = df['CLOSE'].pct_change() * 100
+        close = df['CLOSE'].to_numpy(dtype=float)
+        daily_return = np.empty_like(close)
+        daily_return[0] = np.nan
+        np.divide(close[1:], close[:-1], out=daily_return[1:])
+        daily_return[1:] -= 1.0
+        daily_return *= 100.0
+        df['DAILY_RETURN'] = daily_return
         
         # Calculate some statistics
         avg_return = df['DAILY_RETURN'].mean()
@@ -87,7 +95,7 @@ def fetch_corporate_bond_index(from_date, to_date=None):
     # Save to CSV
     date_str = datetime.now().strftime("%Y%m%d")
     output_file = data_dir / f"{ticker}_{date_str}.csv"
-    df.to_csv(output_file, index=False)
+    save_csv(df, output_file, parquet_mirror=True)
     
     logger.info(f"Data saved to {output_file}")
     
@@ -19,6 +19,7 @@ sys.path.append(str(project_dir))
 
 # Import the MOEX data source
 from src.moex_api_client import MOEXDataSource
+from src.storage import save_csv
 
 def main():
     """Simple example to fetch IMOEX (Moscow Exchange Index) data."""
@@ -54,7 +55,7 @@ def main():
     output_dir.mkdir(parents=True, exist_ok=True)
     
     output_file = output_dir / f"IMOEX_{datetime.now().strftime('%Y%m%d')}.csv"
-    df.to_csv(output_file, index=False)
+    save_csv(df, output_file)
     
     print(f"\nData saved to {output_file}")
 
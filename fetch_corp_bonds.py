@@ -8,9 +8,12 @@ import os
 import sys
 import logging
 import pandas as pd
+import pyarrow as pa
 from datetime import datetime, timedelta
 from pathlib import Path
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
 # Set up project paths
@@ -18,7 +21,8 @@ script_dir = Path(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(str(script_dir))
 
 # Import the MOEX data source
-from src.moex_api_client import MOEXDataSource
+from src.moex_api_client import CONCAT_NO_COPY, MOEXDataSource
+from src.storage import save_csv
 
 # Configure logging
 logging.basicConfig(
@@ -27,19 +31,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger('fetch_corp_bonds')
 
+# Maximum number of bonds fetched concurrently
+FETCH_WORKERS = 8
+
+# Sustained request rate to the API (requests per second) and allowed burst
+RATE_LIMIT = 10
+RATE_BURST = 20
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    
+    Up to `capacity` calls pass immediately; after that, calls are spread
+    out to `rate` per second.
+    """
+    
+    def __init__(self, rate=RATE_LIMIT, capacity=RATE_BURST):
+        """
+        Initialize the rate limiter with a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only while the bucket is empty."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def _fetch_one(moex, secid, shortname, start_date, end_date):
+    """
+    Fetch historical data for a single bond.
+    
+    Args:
+        moex: MOEXDataSource instance
+        secid: MOEX security ID of the bond
+        shortname: Short name of the bond
+        start_date: Start date for historical data
+        end_date: End date for historical data
+    
+    Returns:
+        DataFrame with bond data, or None if no data was found
+    """
+    logger.info(f"Fetching data for {secid}")
+    
+    # Fetch historical data
+    df = moex.get_historical_data(
+        engine='stock',
+        market='bonds',
+        board='TQCB',
+        security=secid,
+        from_date=start_date,
+        till_date=end_date
+    )
+    
+    if df.empty:
+        logger.warning(f"No data found for {secid}")
+        return None
+        
+    # Add bond identifier
+    df['SECID'] = secid
+    
+    # Add bond name
+    df['SHORTNAME'] = shortname
+    
+    return df
+
 def fetch_corporate_bonds(limit=100, output_file=None):
     """
     Fetch data for corporate bonds from MOEX.
     
     Args:
         limit: Maximum number of bonds to fetch (default: 100)
-        output_file: Path to save the data (default: None, will use a timestamp)
+        output_file: Path to save the data (default: None, will use a timestamp).
+            Saved as CSV if the path ends with .csv, otherwise as Parquet.
     
     Returns:
         DataFrame with bond data
     """
-    # Initialize MOEX data source
-    moex = MOEXDataSource()
+    # Initialize MOEX data source; every HTTP request it sends, including
+    # each history page, takes a token from the shared rate limiter
+    moex = MOEXDataSource(rate_limiter=TokenBucket())
     
     # Get corporate bonds from TQCB board (main corporate bonds board)
     logger.info("Fetching list of corporate bonds...")
@@ -55,65 +141,58 @@ def fetch_corporate_bonds(limit=100, output_file=None):
     # Limit the number of bonds to fetch
     bonds = bonds.head(limit)
     
-    # Prepare to store all data
-    all_data = []
+    # Prepare to store all data, keyed by SECID
+    results = {}
     
     # Set date range for the last 1 year
     end_date = datetime.now()
     start_date = end_date - timedelta(days=365)
     
-    # Fetch data for each bond
-    for _, bond in tqdm(bonds.iterrows(), total=len(bonds), desc="Fetching bond data"):
-        try:
-            secid = bond['SECID']
-            logger.info(f"Fetching data for {secid}")
-            
-            # Fetch historical data
-            df = moex.get_historical_data(
-                engine='stock',
-                market='bonds',
-                board='TQCB',
-                security=secid,
-                from_date=start_date,
-                till_date=end_date
-            )
-            
-            if df.empty:
-                logger.warning(f"No data found for {secid}")
-                continue
-                
-            # Add bond identifier
-            df['SECID'] = secid
-            
-            # Add bond name
-            df['SHORTNAME'] = bond.get('SHORTNAME', '')
-            
-            # Add to our collection
-            all_data.append(df)
-            
-            # Be nice to the API
-            time.sleep(0.5)
-            
-        except Exception as e:
-            logger.error(f"Error fetching data for {bond.get('SECID', 'unknown')}: {str(e)}")
-    
-    # Combine all data
+    # Fetch data for the bonds concurrently, within the API rate limit
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        # Plain column lists avoid building a Series for every row
+        futures = {
+            executor.submit(_fetch_one, moex, secid, shortname, start_date, end_date): secid
+            for secid, shortname in zip(bonds['SECID'].tolist(), bonds['SHORTNAME'].tolist())
+        }
+        
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Fetching bond data"):
+            secid = futures[future]
+            try:
+                df = future.result()
+                if df is not None:
+                    results[secid] = df
+            except Exception as e:
+                logger.error(f"Error fetching data for {secid}: {str(e)}")
+    
+    # Combine all data in listing order, whatever order the fetches finished in
+    all_data = [results[secid] for secid in bonds['SECID'].tolist() if secid in results]
     if not all_data:
         logger.error("No data was collected")
         return pd.DataFrame()
         
-    combined_data = pd.concat(all_data, ignore_index=True)
+    combined_data = pd.concat(all_data, ignore_index=True, **CONCAT_NO_COPY)
     logger.info(f"Collected {len(combined_data)} records for {len(all_data)} bonds")
     
     # Save to file if requested
     if output_file is None:
-        output_file = f"data/corp_bonds_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        output_file = f"data/corp_bonds_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
     
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
     
-    # Save to CSV
-    combined_data.to_csv(output_file, index=False)
+    # Save in the format given by the file extension
+    if str(output_file).endswith('.csv'):
+        save_csv(combined_data, output_file)
+    else:
+        try:
+            combined_data.to_parquet(output_file, compression='snappy', engine='pyarrow', index=False)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            # A column mixing value types cannot be stored in Parquet; keep
+            # the downloaded data as CSV rather than losing it
+            output_file = str(Path(output_file).with_suffix('.csv'))
+            logger.warning(f"Could not write Parquet ({e}), saving as CSV instead")
+            save_csv(combined_data, output_file)
     logger.info(f"Data saved to {output_file}")
     
     return combined_data
@@ -123,7 +202,7 @@ if __name__ == "__main__":
     os.makedirs("data", exist_ok=True)
     
     # Output file path
-    output_file = "data/corp_bonds_100.csv"
+    output_file = "data/corp_bonds_100.parquet"
     
     # Fetch data for 100 corporate bonds
     data = fetch_corporate_bonds(limit=100, output_file=output_file)
@@ -33,5 +33,9 @@ setup(
         "requests>=2.31.0",
         "python-dotenv>=1.0.0",
         "tqdm>=4.66.1",
+        "pyarrow>=14.0.0",
     ],
+    extras_require={
+        "cache": ["requests-cache>=1.1"],
+    },
 )
\ No newline at end of file
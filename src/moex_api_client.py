@@ -9,11 +9,31 @@ Based on the ISS API documentation: https://fs.moex.com/files/8888
 import logging
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from pathlib import Path
 import os
 import json
-from typing import Dict, List, Optional, Union, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
 
 # Configure logging
 logging.basicConfig(
@@ -45,6 +65,131 @@ BOARD_TQBR = "TQBR"  # Main shares board
 BOARD_TQCB = "TQCB"  # Main corporate bonds board
 BOARD_TQOB = "TQOB"  # Main government bonds board
 
+# Connection pool size per host; large enough for concurrent page and bond fetches
+HTTP_POOL_SIZE = 32
+
+# Rows per history page, used when a response carries no cursor block
+HISTORY_PAGE_SIZE = 100
+
+# Maximum number of history pages fetched concurrently
+HISTORY_PAGE_WORKERS = 8
+
+# How long securities lists are reused before being fetched again (seconds)
+SECURITIES_CACHE_TTL = 3600
+
+# Keyword arguments for pd.concat that skip copying the inputs. pandas 3 uses
+# copy-on-write, so concat no longer copies and the copy keyword is deprecated.
+CONCAT_NO_COPY = {'copy': False} if int(pd.__version__.split('.')[0]) < 3 else {}
+
+# Environment variable naming an SQLite file for the shared session's on-disk
+# HTTP cache. Caching is off unless it (or a client's http_cache) is set.
+HTTP_CACHE_ENV = "MOEX_HTTP_CACHE"
+
+# How long cached responses are reused, by URL pattern (seconds). Bondization
+# data changes rarely; history is kept briefly so end-of-day bars stay fresh.
+# Responses from any other URL are not cached.
+HTTP_CACHE_EXPIRY = {
+    "iss.moex.com/iss/statistics/engines/stock/markets/bonds/bondization/*": 3600,
+    "iss.moex.com/iss/history/*": 60,
+}
+
+def _build_session(http_cache: Optional[Union[str, Path]] = None) -> requests.Session:
+    """
+    Create a session with an enlarged connection pool and retries on
+    transient server errors.
+    
+    Args:
+        http_cache: Optional path of an SQLite file in which the responses
+            listed in HTTP_CACHE_EXPIRY are cached, with a stale copy served if
+            the server errors. Requires requests-cache.
+    """
+    if http_cache and requests_cache is None:
+        logger.warning(f"requests-cache is not installed, HTTP cache {http_cache} is disabled")
+    if http_cache and requests_cache is not None:
+        session = requests_cache.CachedSession(
+            str(http_cache),
+            backend='sqlite',
+            allowable_methods=('GET',),
+            stale_if_error=True,
+            urls_expire_after={**HTTP_CACHE_EXPIRY, '*': requests_cache.DO_NOT_CACHE}
+        )
+    else:
+        session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Session shared by all clients created without credentials or a session of
+# their own, built on first use
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+def _get_shared_session() -> requests.Session:
+    """Return the shared session, creating it (cached if HTTP_CACHE_ENV is set) on first call."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = _build_session(os.environ.get(HTTP_CACHE_ENV))
+        return _shared_session
+
+def _loads(content: bytes) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _format_date(date: Optional[Union[str, datetime]]) -> Optional[str]:
+    """Format a date as the YYYY-MM-DD string ISS expects; strings and None pass through."""
+    if date is None or isinstance(date, str):
+        return date
+    return date.strftime('%Y-%m-%d')
+
+def _df_from_block(block: Dict) -> pd.DataFrame:
+    """Build a DataFrame from an ISS data block with 'columns' and row-major 'data'."""
+    return pd.DataFrame.from_records(block['data'], columns=block['columns'])
+
+def _concat_blocks(blocks: List[Dict]) -> pd.DataFrame:
+    """
+    Combine ISS data blocks sharing one set of columns into a single DataFrame.
+    
+    Each block becomes a pyarrow Table and the tables are concatenated before a
+    single conversion to pandas. Falls back to concatenating per-block
+    DataFrames when pyarrow is not installed or a column holds values that do
+    not fit one Arrow type.
+    """
+    if pa is not None:
+        try:
+            tables = [
+                pa.Table.from_arrays(
+                    [pa.array(list(col)) for col in zip(*block['data'])],
+                    names=block['columns']
+                )
+                for block in blocks
+            ]
+            return pa.concat_tables(tables, promote_options='permissive').to_pandas()
+        except pa.ArrowException as e:
+            logger.debug(f"Falling back to pandas concat: {e}")
+    
+    return pd.concat([_df_from_block(block) for block in blocks], ignore_index=True, **CONCAT_NO_COPY)
+
+def _convert_trade_date(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the TRADEDATE column of a history DataFrame to datetime, in place."""
+    if 'TRADEDATE' in df.columns:
+        df['TRADEDATE'] = pd.to_datetime(df['TRADEDATE'], format='%Y-%m-%d', cache=True)
+    return df
+
+def _history_cursor(data: Dict) -> Optional[Dict[str, int]]:
+    """Extract the pagination cursor (INDEX, TOTAL, PAGESIZE) from a history response."""
+    block = data.get('history.cursor')
+    if not block or not block['data']:
+        return None
+    return dict(zip(block['columns'], block['data'][0]))
+
 class MOEXDataSource:
     """
     Data source handler for MOEX ISS API.
@@ -55,17 +200,42 @@ class MOEXDataSource:
     BASE_URL = BASE_URL
     HISTORY_URL = HISTORY_URL
     
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None):
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        http_cache: Optional[Union[str, Path]] = None,
+        rate_limiter: Optional[Any] = None
+    ):
         """
         Initialize the MOEX data source.
         
         Args:
             username: Optional username for authenticated access
             password: Optional password for authenticated access
+            session: Optional pre-configured session; defaults to the session
+                shared with MOEXBondData
+            http_cache: Optional path of an SQLite file for an on-disk cache of
+                bondization and history responses (requires requests-cache);
+                gives this client a session of its own
+            rate_limiter: Optional object whose acquire() method is called
+                before every HTTP request, blocking until it may be sent
         """
         self.username = username
+        self.rate_limiter = rate_limiter
         self.password = password
-        self.session = requests.Session()
+        if session is not None:
+            self.session = session
+        elif (username and password) or http_cache:
+            # Credentials get a session of their own, uncached unless asked for,
+            # so neither they nor their responses leak into the shared one
+            self.session = _build_session(http_cache)
+        else:
+            self.session = _get_shared_session()
+        
+        # Securities lists keyed by (engine, market, board), with fetch time
+        self._securities_cache: Dict[tuple, Tuple[float, pd.DataFrame]] = {}
         
         # Set up authentication if provided
         if username and password:
@@ -90,6 +260,10 @@ class MOEXDataSource:
         if 'lang' not in params:
             params['lang'] = 'en'
         
+        # Wait for the rate limiter, if any
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
         try:
             response = self.session.get(url, params=params)
             response.raise_for_status()
@@ -110,7 +284,25 @@ class MOEXDataSource:
             Dictionary with the JSON response
         """
         response = self._make_request(url + '.json', params)
-        return response.json()
+        return _loads(response.content)
+    
+    def _get_block(self, url: str, block: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Get a single data block from the MOEX ISS API.
+        
+        Asks the server for only the requested block and without metadata,
+        which keeps responses small.
+        
+        Args:
+            url: The URL to request
+            block: Name of the data block (e.g., 'securities')
+            params: Optional parameters to include in the request
+            
+        Returns:
+            Dictionary with the block's 'columns' and 'data'
+        """
+        params = {**(params or {}), 'iss.only': block, 'iss.meta': 'off'}
+        return self._get_json_data(url, params)[block]
     
     def get_engines(self) -> pd.DataFrame:
         """
@@ -120,8 +312,8 @@ class MOEXDataSource:
             DataFrame with engine information
         """
         url = f"{self.BASE_URL}/engines"
-        data = self._get_json_data(url)
-        return pd.DataFrame(data['engines']['data'], columns=data['engines']['columns'])
+        block = self._get_block(url, 'engines')
+        return _df_from_block(block)
     
     def get_markets(self, engine: str) -> pd.DataFrame:
         """
@@ -134,8 +326,8 @@ class MOEXDataSource:
             DataFrame with market information
         """
         url = f"{self.BASE_URL}/engines/{engine}/markets"
-        data = self._get_json_data(url)
-        return pd.DataFrame(data['markets']['data'], columns=data['markets']['columns'])
+        block = self._get_block(url, 'markets')
+        return _df_from_block(block)
     
     def get_boards(self, engine: str, market: str) -> pd.DataFrame:
         """
@@ -149,13 +341,15 @@ class MOEXDataSource:
             DataFrame with board information
         """
         url = f"{self.BASE_URL}/engines/{engine}/markets/{market}/boards"
-        data = self._get_json_data(url)
-        return pd.DataFrame(data['boards']['data'], columns=data['boards']['columns'])
+        block = self._get_block(url, 'boards')
+        return _df_from_block(block)
     
     def get_securities(self, engine: str, market: str, board: Optional[str] = None) -> pd.DataFrame:
         """
         Get the list of securities for a specific engine and market.
         
+        Results are cached per instance for SECURITIES_CACHE_TTL seconds.
+        
         Args:
             engine: Engine name (e.g., 'stock')
             market: Market name (e.g., 'index')
@@ -164,13 +358,20 @@ class MOEXDataSource:
         Returns:
             DataFrame with securities information
         """
+        key = (engine, market, board)
+        cached = self._securities_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < SECURITIES_CACHE_TTL:
+            return cached[1].copy()
+        
         if board:
             url = f"{self.BASE_URL}/engines/{engine}/markets/{market}/boards/{board}/securities"
         else:
             url = f"{self.BASE_URL}/engines/{engine}/markets/{market}/securities"
         
-        data = self._get_json_data(url)
-        return pd.DataFrame(data['securities']['data'], columns=data['securities']['columns'])
+        block = self._get_block(url, 'securities')
+        securities = _df_from_block(block)
+        self._securities_cache[key] = (time.monotonic(), securities)
+        return securities.copy()
     
     def get_historical_data(
         self, 
@@ -197,65 +398,114 @@ class MOEXDataSource:
         Returns:
             DataFrame with historical data
         """
+        blocks = list(self._iter_history_blocks(
+            engine, market, board, security, from_date, till_date, interval
+        ))
+        
+        # Combine all data
+        if not blocks:
+            return pd.DataFrame()
+            
+        return _convert_trade_date(_concat_blocks(blocks))
+    
+    def iter_historical_data(
+        self, 
+        engine: str, 
+        market: str, 
+        board: str, 
+        security: str, 
+        from_date: Optional[Union[str, datetime]] = None,
+        till_date: Optional[Union[str, datetime]] = None,
+        interval: int = 24  # Daily data
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over historical data for a specific security one page at a time.
+        
+        Takes the same arguments as get_historical_data. Pages are yielded in
+        date order and only a few are held in memory at once, so long
+        histories can be written out incrementally.
+        
+        Args:
+            engine: Engine name (e.g., 'stock')
+            market: Market name (e.g., 'index')
+            board: Board name (e.g., 'SNDX')
+            security: Security ticker (e.g., 'IMOEX')
+            from_date: Optional start date (default: 30 days ago)
+            till_date: Optional end date (default: today)
+            interval: Optional interval in hours (default: 24 for daily data)
+            
+        Yields:
+            DataFrame with one page of historical data
+        """
+        for block in self._iter_history_blocks(
+            engine, market, board, security, from_date, till_date, interval
+        ):
+            yield _convert_trade_date(_df_from_block(block))
+    
+    def _iter_history_blocks(
+        self,
+        engine: str,
+        market: str,
+        board: str,
+        security: str,
+        from_date: Optional[Union[str, datetime]],
+        till_date: Optional[Union[str, datetime]],
+        interval: int
+    ) -> Iterator[Dict]:
+        """
+        Fetch the pages of a history query and yield their non-empty history blocks.
+        
+        Returns:
+            Iterator over the history blocks, in page order
+        """
         # Set default dates if not provided
         if from_date is None:
             from_date = datetime.now() - timedelta(days=30)
         if till_date is None:
             till_date = datetime.now()
         
-        # Convert dates to strings if they are datetime objects
-        if isinstance(from_date, datetime):
-            from_date = from_date.strftime('%Y-%m-%d')
-        if isinstance(till_date, datetime):
-            till_date = till_date.strftime('%Y-%m-%d')
-        
         # Prepare URL and parameters
         url = f"{self.HISTORY_URL}/engines/{engine}/markets/{market}/boards/{board}/securities/{security}"
         params = {
-            'from': from_date,
-            'till': till_date,
-            'interval': interval
+            'from': _format_date(from_date),
+            'till': _format_date(till_date),
+            'interval': interval,
+            'iss.only': 'history,history.cursor',
+            'iss.meta': 'off'
         }
         
-        # Get data with pagination
-        all_data = []
-        start = 0
+        # Get the first page; its cursor block holds the total number of rows
+        # and the page size, so the exact set of remaining pages is known
+        data = self._get_json_data(url, {**params, 'start': 0})
+        cursor = _history_cursor(data)
+        rows = data.get('history', {}).get('data', [])
+        if rows:
+            yield data['history']
         
-        while True:
-            # Add start parameter for pagination
-            params['start'] = start
-            
-            # Get data
-            data = self._get_json_data(url, params)
-            
-            # Extract history data
-            if 'history' not in data or not data['history']['data']:
-                break
-                
-            # Convert to DataFrame
-            df = pd.DataFrame(data['history']['data'], columns=data['history']['columns'])
-            
-            # Add to our collection
-            all_data.append(df)
-            
-            # Check if we need to get more data
-            if len(df) < 100:  # MOEX API returns max 100 records per request
-                break
-                
-            # Move to next page
-            start += 100
-        
-        # Combine all data
-        if not all_data:
-            return pd.DataFrame()
-            
-        combined_data = pd.concat(all_data, ignore_index=True)
-        
-        # Convert date column to datetime
-        if 'TRADEDATE' in combined_data.columns:
-            combined_data['TRADEDATE'] = pd.to_datetime(combined_data['TRADEDATE'])
-        
-        return combined_data
+        if cursor is not None:
+            # Fetch the remaining pages concurrently, one batch of workers
+            # at a time so only a bounded number of pages is held in memory
+            page_size = cursor.get('PAGESIZE') or HISTORY_PAGE_SIZE
+            starts = range(page_size, cursor['TOTAL'], page_size)
+            if starts:
+                with ThreadPoolExecutor(max_workers=min(HISTORY_PAGE_WORKERS, len(starts))) as executor:
+                    for i in range(0, len(starts), HISTORY_PAGE_WORKERS):
+                        pages = executor.map(
+                            lambda start: self._get_json_data(url, {**params, 'start': start}),
+                            starts[i:i + HISTORY_PAGE_WORKERS]
+                        )
+                        for data in pages:
+                            if 'history' in data and data['history']['data']:
+                                yield data['history']
+        else:
+            # Without a cursor, walk the pages until a short one is returned
+            start = 0
+            while len(rows) >= HISTORY_PAGE_SIZE:
+                start += HISTORY_PAGE_SIZE
+                data = self._get_json_data(url, {**params, 'start': start})
+                rows = data.get('history', {}).get('data', [])
+                if rows:
+                    yield data['history']
     
     def get_index_data(self, index_name: str, from_date: Optional[Union[str, datetime]] = None) -> pd.DataFrame:
         """
@@ -14,11 +14,16 @@ Designed specifically for Russian domestic bonds.
 
 import os
 import logging
+import threading
 import requests
 import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, Union, List, Dict, Any, Tuple
 
+from .moex_api_client import _build_session, _df_from_block, _format_date, _get_shared_session, _loads
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +31,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Event date column of each bondization block
+BONDIZATION_DATE_COLUMNS = {
+    'coupons': 'coupondate',
+    'amortizations': 'amortdate',
+    'offers': 'offerdate'
+}
+
 class MOEXBondData:
     """
     Class for fetching detailed bond data from MOEX ISS API.
@@ -34,9 +46,44 @@ class MOEXBondData:
     
     BASE_URL = "https://iss.moex.com/iss"
     
-    def __init__(self):
-        """Initialize the MOEX Bond Data fetcher."""
-        self.session = requests.Session()
+    def __init__(self,
+                 session: Optional[requests.Session] = None,
+                 http_cache: Optional[Union[str, Path]] = None):
+        """
+        Initialize the MOEX Bond Data fetcher.
+        
+        Args:
+            session: Optional pre-configured session; defaults to the session
+                shared with MOEXDataSource
+            http_cache: Optional path of an SQLite file for an on-disk cache of
+                bondization and history responses (requires requests-cache);
+                gives this client a session of its own
+        """
+        if session is not None:
+            self.session = session
+        elif http_cache:
+            self.session = _build_session(http_cache)
+        else:
+            self.session = _get_shared_session()
+        
+        # Resolved security information keyed by ISIN
+        self._secinfo_cache: Dict[str, Dict[str, str]] = {}
+        
+        # Bondization responses (coupons, amortizations and offers) keyed by
+        # security ID, as futures so concurrent callers share one request
+        self._bondization_cache: Dict[str, Future] = {}
+        self._bondization_lock = threading.Lock()
+    
+    def invalidate(self) -> None:
+        """
+        Drop all cached lookups and bondization responses.
+        
+        Long-running processes can call this to pick up newly announced
+        coupons or offers.
+        """
+        self._secinfo_cache.clear()
+        with self._bondization_lock:
+            self._bondization_cache.clear()
     
     def _make_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -64,12 +111,12 @@ class MOEXBondData:
         try:
             response = self.session.get(url, params=default_params)
             response.raise_for_status()
-            return response.json()
+            return _loads(response.content)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error making request to {url}: {e}")
             raise
     
-    def get_bond_parameters(self, isin: str) -> pd.DataFrame:
+    def get_bond_parameters(self, isin: str) -> Dict[str, pd.DataFrame]:
         """
         Get detailed parameters for a specific bond by its ISIN.
         
@@ -77,42 +124,40 @@ class MOEXBondData:
             isin: International Securities Identification Number
             
         Returns:
-            DataFrame containing bond parameters
+            Dictionary mapping each non-empty response block (e.g. 'description',
+            'boards') to a DataFrame with that block's own columns
         """
         # First get the security ID from the ISIN
         security_info = self._get_security_info_by_isin(isin)
         
         if not security_info:
             logger.error(f"Could not find security info for ISIN {isin}")
-            return pd.DataFrame()
+            return {}
         
-        secid = security_info.get('secid')
+        return self._fetch_bond_parameters(isin, security_info.get('secid'))
+    
+    def get_bond_parameters_flat(self, isin: str) -> pd.DataFrame:
+        """
+        Get detailed parameters for a specific bond as a single DataFrame.
         
-        # Now fetch the security details using the security ID
-        url = f"{self.BASE_URL}/securities/{secid}"
-        response = self._make_request(url)
+        All blocks returned by get_bond_parameters are stacked, with a
+        'data_block' column naming the block each row came from.
         
-        # The securities endpoint returns multiple data blocks
-        # We'll combine them into a single DataFrame for easier use
-        result_dfs = []
+        Args:
+            isin: International Securities Identification Number
+            
+        Returns:
+            DataFrame containing bond parameters
+        """
+        blocks = self.get_bond_parameters(isin)
         
-        # Process each data block in the response
-        for block_name, block_data in response.items():
-            if 'data' in block_data and block_data['data']:
-                df = pd.DataFrame(
-                    data=block_data['data'],
-                    columns=block_data['columns']
-                )
-                # Add a column to identify which data block this came from
-                df['data_block'] = block_name
-                result_dfs.append(df)
-        
-        if result_dfs:
-            # Combine all data blocks into a single DataFrame
-            return pd.concat(result_dfs, ignore_index=True)
-        else:
-            logger.warning(f"No parameter data found for bond {isin}")
+        if not blocks:
             return pd.DataFrame()
+        
+        return pd.concat(
+            [df.assign(data_block=block_name) for block_name, df in blocks.items()],
+            ignore_index=True
+        )
     
     def get_bond_daily_trading(self, 
                               isin: str, 
@@ -136,47 +181,7 @@ class MOEXBondData:
             logger.error(f"Could not find security info for ISIN {isin}")
             return pd.DataFrame()
         
-        secid = security_info.get('secid')
-        board = security_info.get('primary_boardid', 'TQCB')  # Default to TQCB (corporate bonds)
-        
-        # Format dates
-        from_date_str = None
-        till_date_str = None
-        
-        if from_date:
-            if isinstance(from_date, str):
-                from_date_str = from_date
-            else:
-                from_date_str = from_date.strftime('%Y-%m-%d')
-                
-        if till_date:
-            if isinstance(till_date, str):
-                till_date_str = till_date
-            else:
-                till_date_str = till_date.strftime('%Y-%m-%d')
-        
-        # Construct URL for historical data
-        url = f"{self.BASE_URL}/history/engines/stock/markets/bonds/boards/{board}/securities/{secid}"
-        
-        params = {}
-        if from_date_str:
-            params['from'] = from_date_str
-        if till_date_str:
-            params['till'] = till_date_str
-            
-        # Make the request
-        response = self._make_request(url, params)
-        
-        # Process the response
-        if 'history' in response and 'data' in response['history']:
-            df = pd.DataFrame(
-                data=response['history']['data'],
-                columns=response['history']['columns']
-            )
-            return df
-        else:
-            logger.warning(f"No historical data found for bond {isin}")
-            return pd.DataFrame()
+        return self._fetch_bond_daily_trading(isin, security_info, from_date, till_date)
     
     def get_bond_coupons(self, isin: str) -> pd.DataFrame:
         """
@@ -188,29 +193,7 @@ class MOEXBondData:
         Returns:
             DataFrame containing coupon payment schedule
         """
-        # Get security ID first
-        security_info = self._get_security_info_by_isin(isin)
-        
-        if not security_info:
-            logger.error(f"Could not find security info for ISIN {isin}")
-            return pd.DataFrame()
-        
-        secid = security_info.get('secid')
-        
-        # Use the bondization endpoint
-        url = f"{self.BASE_URL}/statistics/engines/stock/markets/bonds/bondization/{secid}"
-        response = self._make_request(url)
-        
-        # Extract coupon data
-        if 'coupons' in response and 'data' in response['coupons']:
-            df = pd.DataFrame(
-                data=response['coupons']['data'],
-                columns=response['coupons']['columns']
-            )
-            return df
-        else:
-            logger.warning(f"No coupon data found for bond {isin}")
-            return pd.DataFrame()
+        return self._get_bondization_block(isin, 'coupons', 'coupon')
     
     def get_bond_amortizations(self, isin: str) -> pd.DataFrame:
         """
@@ -222,29 +205,7 @@ class MOEXBondData:
         Returns:
             DataFrame containing amortization schedule
         """
-        # Get security ID first
-        security_info = self._get_security_info_by_isin(isin)
-        
-        if not security_info:
-            logger.error(f"Could not find security info for ISIN {isin}")
-            return pd.DataFrame()
-        
-        secid = security_info.get('secid')
-        
-        # Use the bondization endpoint
-        url = f"{self.BASE_URL}/statistics/engines/stock/markets/bonds/bondization/{secid}"
-        response = self._make_request(url)
-        
-        # Extract amortization data
-        if 'amortizations' in response and 'data' in response['amortizations']:
-            df = pd.DataFrame(
-                data=response['amortizations']['data'],
-                columns=response['amortizations']['columns']
-            )
-            return df
-        else:
-            logger.warning(f"No amortization data found for bond {isin}")
-            return pd.DataFrame()
+        return self._get_bondization_block(isin, 'amortizations', 'amortization')
     
     def get_bond_offers(self, isin: str) -> pd.DataFrame:
         """
@@ -256,29 +217,7 @@ class MOEXBondData:
         Returns:
             DataFrame containing offer information
         """
-        # Get security ID first
-        security_info = self._get_security_info_by_isin(isin)
-        
-        if not security_info:
-            logger.error(f"Could not find security info for ISIN {isin}")
-            return pd.DataFrame()
-        
-        secid = security_info.get('secid')
-        
-        # Use the bondization endpoint
-        url = f"{self.BASE_URL}/statistics/engines/stock/markets/bonds/bondization/{secid}"
-        response = self._make_request(url)
-        
-        # Extract offer data
-        if 'offers' in response and 'data' in response['offers']:
-            df = pd.DataFrame(
-                data=response['offers']['data'],
-                columns=response['offers']['columns']
-            )
-            return df
-        else:
-            logger.warning(f"No offer data found for bond {isin}")
-            return pd.DataFrame()
+        return self._get_bondization_block(isin, 'offers', 'offer')
     
     def find_russian_domestic_bonds(self, 
                                    from_date: Optional[Union[str, datetime]] = None,
@@ -307,13 +246,10 @@ class MOEXBondData:
             
         # Get list of all bonds
         url = f"{self.BASE_URL}/engines/stock/markets/bonds/securities"
-        response = self._make_request(url)
+        response = self._make_request(url, {'iss.only': 'securities'})
         
         if 'securities' in response and 'data' in response['securities']:
-            all_bonds = pd.DataFrame(
-                data=response['securities']['data'],
-                columns=response['securities']['columns']
-            )
+            all_bonds = _df_from_block(response['securities'])
             
             # Filter for Russian domestic bonds
             # Typically, Russian domestic bonds have ISIN starting with "RU"
@@ -327,60 +263,309 @@ class MOEXBondData:
             logger.warning("No bond data found")
             return pd.DataFrame()
     
-    def get_complete_bond_data(self, isin: str) -> Dict[str, pd.DataFrame]:
+    def get_complete_bond_data(self, isin: str) -> Dict[str, Any]:
         """
         Get complete data for a specific bond, including parameters, trading history,
         coupons, amortizations, and offers.
         
+        The ISIN is resolved once, then the parameters, trading history and
+        bondization (coupons, amortizations and offers) requests run
+        concurrently.
+        
         Args:
             isin: International Securities Identification Number
             
         Returns:
-            Dictionary containing DataFrames for each data type
-        """
-        result = {
-            'parameters': self.get_bond_parameters(isin),
-            'trading': self.get_bond_daily_trading(isin),
-            'coupons': self.get_bond_coupons(isin),
-            'amortizations': self.get_bond_amortizations(isin),
-            'offers': self.get_bond_offers(isin)
-        }
+            Dictionary containing DataFrames for each data type; 'parameters'
+            holds the dictionary of blocks returned by get_bond_parameters
+        """
+        security_info = self._get_security_info_by_isin(isin)
+        
+        if not security_info:
+            logger.error(f"Could not find security info for ISIN {isin}")
+            result = {name: pd.DataFrame() for name in ('trading', 'coupons', 'amortizations', 'offers')}
+            return {'parameters': {}, **result}
+        
+        secid = security_info.get('secid')
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            parameters = executor.submit(self._fetch_bond_parameters, isin, secid)
+            trading = executor.submit(self._fetch_bond_daily_trading, isin, security_info)
+            bondization = executor.submit(self._fetch_bondization, secid)
+            
+            response = bondization.result()
+            result = {
+                'parameters': parameters.result(),
+                'trading': trading.result(),
+                'coupons': self._extract_bondization_block(isin, response, 'coupons', 'coupon'),
+                'amortizations': self._extract_bondization_block(isin, response, 'amortizations', 'amortization'),
+                'offers': self._extract_bondization_block(isin, response, 'offers', 'offer')
+            }
         return result
     
+    def _fetch_bond_parameters(self, isin: str, secid: str) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch bond parameters for a resolved security ID.
+        
+        Args:
+            isin: International Securities Identification Number (for logging)
+            secid: MOEX security ID
+            
+        Returns:
+            Dictionary mapping each non-empty response block to a DataFrame
+        """
+        # Fetch the security details using the security ID
+        url = f"{self.BASE_URL}/securities/{secid}"
+        response = self._make_request(url)
+        
+        # The securities endpoint returns multiple data blocks with different
+        # columns, so each one is kept as a separate DataFrame
+        result_dfs = {}
+        
+        # Process each data block in the response
+        for block_name, block_data in response.items():
+            if 'data' in block_data and block_data['data']:
+                result_dfs[block_name] = _df_from_block(block_data)
+        
+        if not result_dfs:
+            logger.warning(f"No parameter data found for bond {isin}")
+        return result_dfs
+    
+    def _fetch_bond_daily_trading(self,
+                                  isin: str,
+                                  security_info: Dict[str, str],
+                                  from_date: Optional[Union[str, datetime]] = None,
+                                  till_date: Optional[Union[str, datetime]] = None) -> pd.DataFrame:
+        """
+        Fetch daily trading results for a resolved security.
+        
+        Args:
+            isin: International Securities Identification Number (for logging)
+            security_info: Security information from _get_security_info_by_isin
+            from_date: Start date for data retrieval (inclusive)
+            till_date: End date for data retrieval (inclusive)
+            
+        Returns:
+            DataFrame containing daily trading results
+        """
+        secid = security_info.get('secid')
+        board = security_info.get('primary_boardid', 'TQCB')  # Default to TQCB (corporate bonds)
+        
+        # Format dates
+        from_date_str = _format_date(from_date)
+        till_date_str = _format_date(till_date)
+        
+        # Construct URL for historical data
+        url = f"{self.BASE_URL}/history/engines/stock/markets/bonds/boards/{board}/securities/{secid}"
+        
+        params = {'iss.only': 'history'}
+        if from_date_str:
+            params['from'] = from_date_str
+        if till_date_str:
+            params['till'] = till_date_str
+            
+        # Make the request
+        response = self._make_request(url, params)
+        
+        # Process the response
+        if 'history' in response and 'data' in response['history']:
+            df = _df_from_block(response['history'])
+            
+            # Convert date column to datetime
+            if 'TRADEDATE' in df.columns:
+                df['TRADEDATE'] = pd.to_datetime(df['TRADEDATE'], format='%Y-%m-%d', cache=True)
+            
+            return df
+        else:
+            logger.warning(f"No historical data found for bond {isin}")
+            return pd.DataFrame()
+    
+    def _fetch_bondization(self, secid: str) -> Dict[str, Any]:
+        """
+        Fetch the bondization response (coupons, amortizations and offers) for a security.
+        
+        Responses are cached for the lifetime of the instance (see invalidate),
+        so the coupon, amortization and offer getters share one request, even
+        when called concurrently from different threads.
+        
+        Args:
+            secid: MOEX security ID
+            
+        Returns:
+            Dictionary containing the API response
+        """
+        with self._bondization_lock:
+            future = self._bondization_cache.get(secid)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._bondization_cache[secid] = future
+        
+        # Only the first caller sends the request; the others wait for its result
+        if owner:
+            url = f"{self.BASE_URL}/statistics/engines/stock/markets/bonds/bondization/{secid}"
+            try:
+                future.set_result(self._make_request(url, {'iss.only': 'coupons,amortizations,offers'}))
+            except Exception as e:
+                # Failures are not cached, so a later call retries
+                with self._bondization_lock:
+                    if self._bondization_cache.get(secid) is future:
+                        del self._bondization_cache[secid]
+                future.set_exception(e)
+        
+        return future.result()
+    
+    def _get_bondization_block(self, isin: str, block: str, label: str) -> pd.DataFrame:
+        """
+        Get one block of the bondization data for a bond.
+        
+        Args:
+            isin: International Securities Identification Number
+            block: Block name ('coupons', 'amortizations' or 'offers')
+            label: Human-readable data type for log messages
+            
+        Returns:
+            DataFrame containing the block data
+        """
+        # Get security ID first
+        security_info = self._get_security_info_by_isin(isin)
+        
+        if not security_info:
+            logger.error(f"Could not find security info for ISIN {isin}")
+            return pd.DataFrame()
+        
+        response = self._fetch_bondization(security_info.get('secid'))
+        return self._extract_bondization_block(isin, response, block, label)
+    
+    def _extract_bondization_block(self, isin: str, response: Dict[str, Any], block: str, label: str) -> pd.DataFrame:
+        """
+        Convert one block of a bondization response to a DataFrame.
+        
+        Args:
+            isin: International Securities Identification Number (for logging)
+            response: Bondization response from _fetch_bondization
+            block: Block name ('coupons', 'amortizations' or 'offers')
+            label: Human-readable data type for log messages
+            
+        Returns:
+            DataFrame containing the block data
+        """
+        if block in response and 'data' in response[block]:
+            df = _df_from_block(response[block])
+            
+            # Convert the event date column to datetime; placeholder dates
+            # such as '0000-00-00' become NaT
+            date_column = BONDIZATION_DATE_COLUMNS[block]
+            if date_column in df.columns:
+                df[date_column] = pd.to_datetime(df[date_column], format='%Y-%m-%d', errors='coerce', cache=True)
+            
+            return df
+        else:
+            logger.warning(f"No {label} data found for bond {isin}")
+            return pd.DataFrame()
+    
     def _get_security_info_by_isin(self, isin: str) -> Dict[str, str]:
         """
         Get security ID and board ID for a given ISIN.
         
+        Successful lookups are cached for the lifetime of the instance.
+        
         Args:
             isin: International Securities Identification Number
             
         Returns:
             Dictionary with security information
         """
+        if isin in self._secinfo_cache:
+            return self._secinfo_cache[isin]
+        
         url = f"{self.BASE_URL}/securities"
-        params = {'q': isin}
+        params = {
+            'q': isin,
+            'iss.only': 'securities',
+            'securities.columns': 'secid,isin,primary_boardid'
+        }
         
         response = self._make_request(url, params)
         
         if 'securities' in response and 'data' in response['securities']:
-            securities = response['securities']['data']
-            columns = response['securities']['columns']
-            
-            if securities:
-                # Convert to DataFrame for easier handling
-                df = pd.DataFrame(data=securities, columns=columns)
-                
-                # Find the row with matching ISIN
-                isin_col_idx = columns.index('isin')
-                secid_col_idx = columns.index('secid')
-                primary_board_col_idx = columns.index('primary_boardid') if 'primary_boardid' in columns else None
-                
-                for row in securities:
-                    if row[isin_col_idx] == isin:
-                        result = {'secid': row[secid_col_idx]}
-                        if primary_board_col_idx is not None:
-                            result['primary_boardid'] = row[primary_board_col_idx]
-                        return result
+            df = _df_from_block(response['securities'])
+            
+            # Find the row with matching ISIN
+            hit = df.loc[df['isin'] == isin]
+            
+            if not hit.empty:
+                row = hit.iloc[0]
+                result = {'secid': row['secid']}
+                if 'primary_boardid' in df.columns:
+                    result['primary_boardid'] = row['primary_boardid']
+                self._secinfo_cache[isin] = result
+                return result
         
         logger.warning(f"Could not find security info for ISIN {isin}")
-        return {}
\ No newline at end of file
+        return {}
+    
+    def prefetch_security_info(self,
+                               isins: List[str],
+                               securities: Optional[pd.DataFrame] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Resolve many ISINs up front so later per-bond calls skip the lookup.
+        
+        Args:
+            isins: International Securities Identification Numbers
+            securities: Optional bonds market securities list already fetched
+                (e.g. from find_russian_domestic_bonds), with SECID, ISIN and
+                BOARDID columns, used instead of downloading it again
+            
+        Returns:
+            Dictionary mapping each resolved ISIN to its security information
+        """
+        return self._get_security_info_by_isins(isins, securities)
+    
+    def _get_security_info_by_isins(self,
+                                    isins: List[str],
+                                    securities: Optional[pd.DataFrame] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Get security ID and board ID for several ISINs with one request.
+        
+        Unresolved ISINs are looked up in the bonds market securities list,
+        taken from `securities` or fetched once. An ISIN listed on a single
+        board is resolved to that board; ISINs listed on several boards, or
+        not listed at all, fall back to the per-ISIN search, which knows the
+        primary board. All successful lookups are added to the instance cache.
+        
+        Args:
+            isins: International Securities Identification Numbers
+            securities: Optional bonds market securities list already fetched
+            
+        Returns:
+            Dictionary mapping each resolved ISIN to its security information
+        """
+        missing = [isin for isin in dict.fromkeys(isins) if isin not in self._secinfo_cache]
+        
+        if missing and securities is None:
+            url = f"{self.BASE_URL}/engines/stock/markets/bonds/securities"
+            params = {
+                'iss.only': 'securities',
+                'securities.columns': 'SECID,ISIN,BOARDID'
+            }
+            response = self._make_request(url, params)
+            
+            if 'securities' in response and 'data' in response['securities']:
+                securities = _df_from_block(response['securities'])
+        
+        if missing and securities is not None:
+            df = securities.loc[securities['ISIN'].isin(missing), ['SECID', 'ISIN', 'BOARDID']]
+            
+            # The listing does not say which board is primary, so only trust
+            # it for bonds traded on a single board
+            df = df.drop_duplicates().drop_duplicates('ISIN', keep=False)
+            for secid, isin, boardid in zip(df['SECID'], df['ISIN'], df['BOARDID']):
+                self._secinfo_cache[isin] = {'secid': secid, 'primary_boardid': boardid}
+        
+        result = {}
+        for isin in dict.fromkeys(isins):
+            info = self._get_security_info_by_isin(isin)
+            if info:
+                result[isin] = info
+        return result
\ No newline at end of file
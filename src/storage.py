@@ -0,0 +1,80 @@
+"""
+Storage helpers for MOEX data
+
+This module provides functions for saving fetched MOEX data to disk and
+loading it back.
+"""
+
+import logging
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+def save_csv(df: pd.DataFrame, file_path: Union[str, Path], parquet_mirror: bool = False) -> None:
+    """
+    Save a DataFrame to a CSV file without the index.
+
+    The CSV is always written by DataFrame.to_csv so dates, booleans, floats
+    and quoting keep the format existing consumers of these files expect.
+
+    Args:
+        df: DataFrame to save
+        file_path: Destination path
+        parquet_mirror: Also write a Parquet copy next to the CSV file,
+            which load_cached prefers on later runs
+    """
+    df.to_csv(file_path, index=False)
+
+    # Written after the CSV so the mirror is never older than it
+    if parquet_mirror:
+        save_parquet_mirror(df, file_path)
+
+def save_parquet_mirror(df: pd.DataFrame, file_path: Union[str, Path]) -> None:
+    """
+    Write a zstd-compressed Parquet copy of a DataFrame next to a CSV file.
+
+    The mirror has the same name as the CSV file with a .parquet suffix.
+    Failures (e.g. no Parquet engine installed, or mixed-type columns) are
+    logged and do not affect the CSV output.
+
+    Args:
+        df: DataFrame to save
+        file_path: Path of the CSV file being mirrored
+    """
+    parquet_path = Path(file_path).with_suffix('.parquet')
+    errors = (ImportError, ValueError, TypeError)
+    if pa is not None:
+        errors += (pa.ArrowException,)
+    try:
+        df.to_parquet(parquet_path, compression='zstd', index=False)
+    except errors as e:
+        logger.warning(f"Could not write Parquet mirror {parquet_path}: {e}")
+
+def load_cached(file_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Load data saved by save_csv, preferring its Parquet mirror.
+
+    The mirror is used only if it is at least as recent as the CSV file, so
+    a CSV rewritten without a mirror is never shadowed by stale data.
+
+    Args:
+        file_path: Path of the CSV file
+
+    Returns:
+        DataFrame with the saved data
+    """
+    file_path = Path(file_path)
+    parquet_path = file_path.with_suffix('.parquet')
+    if parquet_path.exists() and (
+        not file_path.exists() or parquet_path.stat().st_mtime >= file_path.stat().st_mtime
+    ):
+        return pd.read_parquet(parquet_path)
+    return pd.read_csv(file_path)